@@ -0,0 +1,132 @@
+"""静态资源构建
+
+把 static/ 下的样式和脚本按 ASSET_BUNDLES 合并、压缩后写入 static/dist/，文件名带内容哈希，
+同时生成预压缩的 .gz 和 .br（需要安装 Brotli，未安装时跳过）以及 manifest.json。
+应用读取 manifest，模板通过 asset_urls() 引用带哈希的文件，并以一年的 immutable 缓存返回；
+未构建或以调试模式运行时仍引用各源文件。
+
+部署时在启动应用前运行一次。旧的构建产物默认保留，滚动发布期间仍持有旧页面的浏览器还能取到；
+指定 --clean 删除 manifest 不再引用的文件。
+
+用法:
+    python build_assets.py
+    python build_assets.py --clean
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # 可选依赖，没有时只生成 .gz
+    brotli = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(HERE, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# 合并后的文件名 -> 按顺序合并的源文件，路径均相对于 static/
+ASSET_BUNDLES = {
+    'css/app.css': ['css/style.css', 'css/table.css'],
+    'js/app.js': ['js/script.js'],
+}
+HASH_LENGTH = 12
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+def load_manifest():
+    """{合并后的文件名: 带哈希的文件名（相对于 static/dist/）}，未构建时返回 None"""
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def minify_css(source):
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    # 只去掉缩进、空行和整行注释：保留换行，不改变自动分号插入，也不会误伤字符串和正则里的 //
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def build_bundle(name, sources):
+    """合并压缩一个文件组，返回 (带哈希的文件名, 压缩后字节数)"""
+    base, ext = os.path.splitext(name)
+    parts = []
+    for source in sources:
+        with open(os.path.join(STATIC_DIR, source), encoding='utf-8') as f:
+            parts.append(MINIFIERS[ext](f.read()))
+    content = '\n'.join(parts).encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    hashed = f'{base}.{digest}{ext}'
+
+    path = os.path.join(DIST_DIR, hashed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    # mtime=0 让相同内容得到相同的 .gz，便于比较构建结果
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(content, quality=11))
+    return hashed, len(content)
+
+
+def clean(manifest):
+    """删除 manifest 不再引用的构建产物"""
+    keep = {os.path.join(DIST_DIR, hashed) for hashed in manifest.values()}
+    keep |= {path + suffix for path in list(keep) for suffix in COMPRESSED_SUFFIXES}
+    keep.add(MANIFEST_PATH)
+    removed = 0
+    for root, _, files in os.walk(DIST_DIR):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if path not in keep:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='合并压缩静态资源并生成带内容哈希的文件和 manifest')
+    parser.add_argument('--clean', action='store_true', help='删除 manifest 不再引用的旧文件')
+    args = parser.parse_args()
+
+    manifest = {}
+    for name, sources in ASSET_BUNDLES.items():
+        original = sum(os.path.getsize(os.path.join(STATIC_DIR, source)) for source in sources)
+        hashed, size = build_bundle(name, sources)
+        manifest[name] = hashed
+        print(f'{name} -> dist/{hashed}（{original} -> {size} 字节）')
+    if brotli is None:
+        print('未安装 Brotli，只生成 .gz 预压缩文件')
+
+    # 先写好各文件再原子替换 manifest，读到的 manifest 引用的文件一定已经存在
+    temp_path = MANIFEST_PATH + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, MANIFEST_PATH)
+    print(f'已写入 {os.path.relpath(MANIFEST_PATH, HERE)}')
+
+    if args.clean:
+        print(f'已删除 {clean(manifest)} 个旧文件')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,84 @@
 import os
 from datetime import timedelta
 
+
+def engine_options(url):
+    """按数据库类型生成连接池参数
+
+    SQLite 内存库使用 StaticPool，不接受 pool_size 等 QueuePool 参数，只保留通用的回收和预检。
+    """
+    options = {
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # 早于 RDS/代理的空闲断开时间
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1',
+    }
+    if not url.startswith('sqlite'):
+        options.update(
+            pool_size=int(os.environ.get('DB_POOL_SIZE', 10)),
+            max_overflow=int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+            pool_timeout=int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        )
+    return options
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-production-secret-key-change-this'
-    
+
     # RDS数据库配置
     DB_HOST = os.environ.get('DB_HOST', 'localhost')
     DB_NAME = os.environ.get('DB_NAME', 'grade_system')
     DB_USER = os.environ.get('DB_USER', 'gradeadmin')
     DB_PASSWORD = os.environ.get('DB_PASSWORD', '')
     DB_PORT = os.environ.get('DB_PORT', '5432')
-    
-    SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+
+    # DATABASE_URL 优先，用于本地开发、测试库或基准测试库
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
+        f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
+
+    # 连接池配置，主库和只读副本各按自己的数据库类型生成
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # 只读副本：设置后只读页面的查询走副本，写入和刚写入过数据的用户仍走主库
+    # Flask-SQLAlchemy 不把 SQLALCHEMY_ENGINE_OPTIONS 用于 binds，副本的连接池参数需单独给出
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {
+        'replica': {'url': DATABASE_REPLICA_URL, **engine_options(DATABASE_REPLICA_URL)},
+    } if DATABASE_REPLICA_URL else {}
+    READ_AFTER_WRITE_SECONDS = int(os.environ.get('READ_AFTER_WRITE_SECONDS', 30))  # 写入后读主库的秒数
+
     # 文件上传配置
     UPLOAD_FOLDER = 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
-    
+
+    # 后台任务和进程内缓存
+    IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', 2))  # 所有进程合计同时运行的成绩导入任务数
+    IMPORT_JOB_STALE_SECONDS = int(os.environ.get('IMPORT_JOB_STALE_SECONDS', 600))  # 处理中的任务超过该秒数没有进度视为中断
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))  # 登录用户缓存秒数
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+    TRANSCRIPT_CACHE_TTL = int(os.environ.get('TRANSCRIPT_CACHE_TTL', 30))  # 成绩单缓存秒数
+    TRANSCRIPT_CACHE_SIZE = int(os.environ.get('TRANSCRIPT_CACHE_SIZE', 50000))
+    RANKING_CACHE_TTL = int(os.environ.get('RANKING_CACHE_TTL', 300))  # 课程排名缓存秒数
+    RANKING_CACHE_SIZE = int(os.environ.get('RANKING_CACHE_SIZE', 200))  # 缓存的课程数，每门课程占用与选课人数成正比
+    SEARCH_INDEX_TTL = int(os.environ.get('SEARCH_INDEX_TTL', 300))  # 非 PostgreSQL 时进程内搜索索引的重建间隔秒数
+
+    # 成绩开放调度：部署时用 flask release-scheduler 单独运行一个调度进程；
+    # 开启后 Web 进程在第一个请求时自己启动调度线程，只适用于单进程的开发服务器
+    RELEASE_SCHEDULER_ENABLED = os.environ.get('RELEASE_SCHEDULER_ENABLED', '0') == '1'
+    RELEASE_SCHEDULER_INTERVAL = int(os.environ.get('RELEASE_SCHEDULER_INTERVAL', 60))  # 最长检查间隔秒数
+    RELEASE_SCHEDULER_LOOKBACK = int(os.environ.get('RELEASE_SCHEDULER_LOOKBACK', 86400))  # 启动时补处理的秒数
+
+    # 成绩开放实时推送：多进程部署时设置为 redis://... ，各 worker 和调度进程通过它转发事件
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+
+    # 性能监控
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))  # 超过该毫秒数的 SQL 记入慢查询日志
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # 生产环境必须设置；未设置时 /metrics 只在调试或测试时允许本机访问
+
     # S3配置（可选，用于生产环境文件存储）
     S3_BUCKET = os.environ.get('S3_BUCKET', '')
     AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID', '')
     AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY', '')
     AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
-    
+
     # 会话配置
-    PERMANENT_SESSION_LIFETIME = timedelta(days=1)
\ No newline at end of file
+    PERMANENT_SESSION_LIFETIME = timedelta(days=1)
@@ -0,0 +1,343 @@
+"""成绩和名单的表格导入
+
+依赖 pandas 和 openpyxl，只在处理上传文件时由 app 延迟导入，
+只处理页面请求的 worker 不必加载这两个库。模型和共用的数据库操作来自 models，
+提交后的缓存失效和推送由调用方通过 on_commit 回调完成，本模块不依赖 app。
+"""
+import time
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import load_workbook
+from sqlalchemy import bindparam
+
+from models import (db, Student, Course, Score, GradeImportError, RosterImportError, ROSTER_IMPORT_SPECS,
+                    SCORE_IMPORT_COLUMNS, SCORE_IMPORT_CHUNK_ROWS, SCORE_IMPORT_MAX_REJECTS, _chunks,
+                    _score_upsert_statement, _roster_upsert_statement, refresh_released_grades)
+
+
+def _normalize_code_column(series):
+    """学号/课程代码统一为去除空白的字符串，兼容 Excel 把编号读成数字的情况"""
+    values = series.astype('string').str.strip()
+    return values.str.replace(r'\.0$', '', regex=True)
+
+
+def import_score_frame(df, teacher_id):
+    """导入一个成绩 DataFrame，返回导入统计和逐行拒绝原因
+
+    调用方负责提交事务。行号按文件行计算（表头为第 1 行）。
+    """
+    frame = pd.DataFrame({
+        'row': df.index + 2,
+        '学号': _normalize_code_column(df['学号']),
+        '课程代码': _normalize_code_column(df['课程代码']),
+        '分数': pd.to_numeric(df['分数'], errors='coerce'),
+    }, index=df.index)
+    reasons = pd.Series(pd.NA, index=frame.index, dtype='object')
+
+    def reject(mask, reason):
+        mask = mask.fillna(False).astype(bool) & reasons.isna()
+        reasons[mask] = reason
+
+    # 1. 基本格式校验，全部向量化
+    reject(frame['学号'].isna() | (frame['学号'] == ''), '学号为空')
+    reject(frame['课程代码'].isna() | (frame['课程代码'] == ''), '课程代码为空')
+    reject(frame['分数'].isna(), '分数不是有效数字')
+    reject((frame['分数'] < 0) | (frame['分数'] > 100), '分数必须在 0-100 之间')
+
+    # 2. 用 IN 查询一次性解析学生和课程
+    pending = reasons.isna()
+    student_ids = frame.loc[pending, '学号'].unique().tolist()
+    known_students = set()
+    for chunk in _chunks(student_ids):
+        known_students.update(
+            row[0] for row in db.session.query(Student.学号).filter(Student.学号.in_(chunk))
+        )
+    reject(~frame['学号'].isin(known_students), '未找到该学生')
+
+    course_codes = frame.loc[reasons.isna(), '课程代码'].unique().tolist()
+    course_teachers = {}
+    for chunk in _chunks(course_codes):
+        course_teachers.update(
+            db.session.query(Course.课程代码, Course.教师工号).filter(Course.课程代码.in_(chunk))
+        )
+    reject(~frame['课程代码'].isin(list(course_teachers)), '课程不存在')
+    own_courses = [code for code, owner in course_teachers.items() if owner == teacher_id]
+    reject(~frame['课程代码'].isin(own_courses), '无权操作该课程')
+
+    # 3. 文件内重复的 (学号, 课程代码) 以最后一行为准
+    pending = reasons.isna()
+    duplicated = frame[pending].duplicated(subset=['学号', '课程代码'], keep='last')
+    reject(duplicated.reindex(frame.index, fill_value=False), '文件中存在重复记录，以最后一行为准')
+
+    valid = frame[reasons.isna()]
+
+    # 4. 查询已有成绩，仅用于区分新增和更新
+    existing = set()
+    valid_courses = valid['课程代码'].unique().tolist()
+    for chunk in _chunks(valid['学号'].unique().tolist()):
+        existing.update(
+            db.session.query(Score.学号, Score.课程代码).filter(
+                Score.课程代码.in_(valid_courses), Score.学号.in_(chunk)
+            )
+        )
+    keys = list(zip(valid['学号'], valid['课程代码']))
+    updated_count = sum(1 for key in keys if key in existing)
+
+    # 5. 分批 upsert
+    now = datetime.now()
+    rows = [
+        {
+            '学号': student_id,
+            '课程代码': course_code,
+            '分数': float(score_value),
+            '录入教师工号': teacher_id,
+            '录入修改时间': now,
+        }
+        for student_id, course_code, score_value in zip(valid['学号'], valid['课程代码'], valid['分数'])
+    ]
+    for batch in _chunks(rows):
+        db.session.execute(_score_upsert_statement(batch))
+    if rows:
+        refresh_released_grades(valid_courses, valid['学号'].unique().tolist(), now=now)
+
+    rejected_frame = frame[reasons.notna()]
+    rejected = [
+        {
+            'row': int(row_number),
+            'student_id': '' if pd.isna(student_id) else student_id,
+            'course_code': '' if pd.isna(course_code) else course_code,
+            'score': '' if pd.isna(raw_score) else raw_score,
+            'reason': reason,
+        }
+        for row_number, student_id, course_code, raw_score, reason in zip(
+            rejected_frame['row'], rejected_frame['学号'], rejected_frame['课程代码'],
+            df.loc[rejected_frame.index, '分数'], reasons[rejected_frame.index],
+        )
+    ]
+
+    return {
+        'total': len(frame),
+        'success_count': len(rows),
+        'inserted': len(rows) - updated_count,
+        'updated': updated_count,
+        'rejected': rejected,
+        'rejected_count': len(rejected),
+        'student_ids': valid['学号'].unique().tolist(),
+        'course_codes': valid_courses,
+    }
+
+
+def _iter_csv_chunks(stream, chunk_rows):
+    # 全部按字符串读取，保留学号前导零，分数交给 import_score_frame 转换
+    with pd.read_csv(stream, chunksize=chunk_rows, dtype=str) as reader:
+        yield from reader
+
+
+def _iter_xlsx_chunks(stream, chunk_rows):
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = ['' if cell is None else str(cell).strip() for cell in header]
+        width = len(columns)
+
+        batch, positions = [], []
+        # 行位置从 0 开始，与 read_csv 的索引一致（表头之后的第一行为 0）
+        for position, values in enumerate(rows):
+            if all(cell is None for cell in values):
+                continue
+            values = tuple(values[:width])
+            batch.append(values + (None,) * (width - len(values)))
+            positions.append(position)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=columns, index=positions)
+                batch, positions = [], []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, index=positions)
+    finally:
+        workbook.close()
+
+
+def import_score_stream(stream, filename, teacher_id, chunk_rows=SCORE_IMPORT_CHUNK_ROWS,
+                        progress=None, on_commit=None):
+    """流式导入成绩文件，逐块校验并提交，内存占用与文件大小无关
+
+    每块提交前会调用 progress(summary)，以便调用方把进度写进同一个事务；
+    提交后调用 on_commit(student_ids, course_codes)，由调用方让缓存失效并推送更新。
+    已提交的块不会因后续块失败而回滚，失败时抛出的 GradeImportError 会说明已提交的条数。
+    """
+    filename = (filename or '').lower()
+    if filename.endswith('.xlsx'):
+        chunks = _iter_xlsx_chunks(stream, chunk_rows)
+    elif filename.endswith('.csv'):
+        chunks = _iter_csv_chunks(stream, chunk_rows)
+    else:
+        raise GradeImportError('不支持的文件格式')
+
+    summary = {
+        'total': 0,
+        'success_count': 0,
+        'inserted': 0,
+        'updated': 0,
+        'rejected': [],
+        'rejected_count': 0,
+        'chunks': 0,
+    }
+    committed = 0
+    started = time.perf_counter()
+    try:
+        for df in chunks:
+            if not all(col in df.columns for col in SCORE_IMPORT_COLUMNS):
+                raise GradeImportError('文件格式错误，缺少必要列')
+
+            result = import_score_frame(df, teacher_id)
+
+            summary['chunks'] += 1
+            for key in ('total', 'success_count', 'inserted', 'updated', 'rejected_count'):
+                summary[key] += result[key]
+            room = SCORE_IMPORT_MAX_REJECTS - len(summary['rejected'])
+            summary['rejected'].extend(result['rejected'][:room])
+            if progress:
+                progress(summary)
+
+            db.session.commit()
+            if on_commit:
+                on_commit(result['student_ids'], result['course_codes'])
+            committed = summary['success_count']
+    except GradeImportError:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        raise GradeImportError(f'导入失败: {e}（此前已提交 {committed} 条成绩）') from e
+    finally:
+        chunks.close()
+
+    summary['elapsed'] = time.perf_counter() - started
+    summary['rows_per_second'] = summary['total'] / summary['elapsed'] if summary['elapsed'] else 0.0
+    return summary
+
+
+def read_table_file(stream, filename):
+    """把整个 CSV/XLSX 读成 DataFrame，行索引从表头后的第一行为 0 开始"""
+    if filename.lower().endswith('.xlsx'):
+        chunks = _iter_xlsx_chunks(stream, SCORE_IMPORT_CHUNK_ROWS)
+    else:
+        chunks = _iter_csv_chunks(stream, SCORE_IMPORT_CHUNK_ROWS)
+    try:
+        frames = list(chunks)
+    finally:
+        chunks.close()
+    return pd.concat(frames) if frames else pd.DataFrame()
+
+
+def import_roster_frame(df, kind):
+    """导入学生或教师名单 DataFrame，已存在的账号按主键更新，返回导入统计和逐行拒绝原因
+
+    密码列可省略或留空，此时已有账号保留原密码，新账号被拒绝。调用方负责提交事务。
+    """
+    spec = ROSTER_IMPORT_SPECS[kind]
+    model, key, fields = spec['model'], spec['key'], spec['fields']
+    table = model.__table__
+
+    frame = pd.DataFrame({'row': df.index + 2, key: _normalize_code_column(df[key])}, index=df.index)
+    for field in fields:
+        frame[field] = df[field].astype('string').str.strip()
+    if '密码' in df.columns:
+        # 密码原样保留，首尾空白和 .0 都可能是密码的一部分；只有完全为空的单元格视为未提供
+        frame['密码'] = df['密码'].astype('string').replace('', pd.NA)
+    else:
+        frame['密码'] = pd.Series(pd.NA, index=df.index, dtype='string')
+    reasons = pd.Series(pd.NA, index=frame.index, dtype='object')
+
+    def reject(mask, reason):
+        mask = mask.fillna(False).astype(bool) & reasons.isna()
+        reasons[mask] = reason
+
+    # 1. 格式校验
+    for column in [key, *fields]:
+        reject(frame[column].isna() | (frame[column] == ''), f'{column}为空')
+    for column in [key, *fields, '密码']:
+        length = table.c[column].type.length
+        reject(frame[column].str.len() > length, f'{column}不能超过 {length} 个字符')
+    if kind == 'student':
+        reject(~frame['性别'].isin(['男', '女']), '性别必须为男或女')
+    else:
+        reject(frame[key] == 'admin', '不能导入管理员账号')
+
+    # 2. 文件内重复的账号以最后一行为准
+    pending = reasons.isna()
+    duplicated = frame[pending].duplicated(subset=[key], keep='last')
+    reject(duplicated.reindex(frame.index, fill_value=False), '文件中存在重复记录，以最后一行为准')
+
+    # 3. 用 IN 查询区分新增和更新，新账号必须提供密码
+    existing = set()
+    for chunk in _chunks(frame.loc[reasons.isna(), key].tolist()):
+        existing.update(value for (value,) in db.session.query(table.c[key]).filter(table.c[key].in_(chunk)))
+    reject(frame['密码'].isna() & ~frame[key].isin(list(existing)), '新账号必须提供密码')
+
+    valid = frame[reasons.isna()]
+    records = [
+        {column: (None if pd.isna(value) else value) for column, value in zip([key, *fields, '密码'], values)}
+        for values in zip(*(valid[column] for column in [key, *fields, '密码']))
+    ]
+
+    # 4. 带密码的行 upsert；不带密码的都是已有账号，只更新资料列
+    with_password = [record for record in records if record['密码'] is not None]
+    for batch in _chunks(with_password):
+        db.session.execute(_roster_upsert_statement(model, key, batch))
+    keep_password = [record for record in records if record['密码'] is None]
+    if keep_password:
+        db.session.execute(
+            table.update().where(table.c[key] == bindparam('b_key')).values(
+                {field: bindparam(f'b_{field}') for field in fields}
+            ),
+            [{'b_key': record[key], **{f'b_{field}': record[field] for field in fields}}
+             for record in keep_password],
+        )
+
+    updated_ids = [record[key] for record in records if record[key] in existing]
+    if kind == 'teacher' and updated_ids:
+        # 已开放成绩中冗余了教师姓名
+        refresh_released_grades([
+            code for (code,) in db.session.query(Course.课程代码).filter(Course.教师工号.in_(updated_ids))
+        ])
+
+    rejected_frame = frame[reasons.notna()]
+    rejected = [
+        {
+            'row': int(row_number),
+            'id': '' if pd.isna(account_id) else account_id,
+            'name': '' if pd.isna(name) else name,
+            'reason': reason,
+        }
+        for row_number, account_id, name, reason in zip(
+            rejected_frame['row'], rejected_frame[key], rejected_frame['姓名'], reasons[rejected_frame.index]
+        )
+    ]
+
+    return {
+        'total': len(frame),
+        'success_count': len(records),
+        'inserted': len(records) - len(updated_ids),
+        'updated': len(updated_ids),
+        'rejected': rejected,
+        'rejected_count': len(rejected),
+        'updated_ids': updated_ids,
+    }
+
+
+def import_roster_file(file_storage, kind):
+    """校验上传的名单文件并导入，不提交事务"""
+    filename = file_storage.filename or ''
+    if not filename.lower().endswith(('.xlsx', '.csv')):
+        raise RosterImportError('不支持的文件格式')
+    df = read_table_file(file_storage.stream, filename)
+    spec = ROSTER_IMPORT_SPECS[kind]
+    missing = [column for column in [spec['key'], *spec['fields']] if column not in df.columns]
+    if missing:
+        raise RosterImportError(f'文件格式错误，缺少必要列: {"、".join(missing)}')
+    return import_roster_frame(df, kind)
@@ -0,0 +1,26 @@
+"""gunicorn 配置
+
+preload_app 让主进程只导入一次应用，worker fork 后与主进程共享已导入模块的内存页；
+pandas/openpyxl 不在导入路径上，只有处理上传文件的 worker 才会加载。
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# 学生仪表盘的 Socket.IO 长连接每条占用一个线程，线程数决定每个 worker 能保持的连接数；
+# 多个 worker 之间需要设置 SOCKETIO_MESSAGE_QUEUE 才能互相转发推送
+threads = int(os.environ.get('GUNICORN_THREADS', 100))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+preload_app = True
+
+# 定期重启 worker，回收处理过大文件导入后留下的内存（包括已加载的 pandas）
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+
+# worker 启动时重建连接池、回收中断的导入任务；成绩开放调度不在 worker 中运行，
+# 另外启动一个 flask --app app release-scheduler 进程
+def post_fork(server, worker):
+    from app import init_worker
+    init_worker()
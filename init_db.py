@@ -1,11 +1,19 @@
+import argparse
+import csv
+import io
 import os
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 
 # 添加当前目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db, Student, Teacher, Course, Score
+from flask_migrate import stamp
+from sqlalchemy import inspect
+from sqlalchemy.schema import AddConstraint, ForeignKeyConstraint, UniqueConstraint
+
+from app import app, db, Student, Teacher, Course, Score, refresh_released_grades
 
 def init_database():
     with app.app_context():
@@ -14,6 +22,8 @@ def init_database():
         db.drop_all()
         print("创建新表...")
         db.create_all()
+        # 新建的表已是最新结构，直接标记迁移版本
+        stamp()
         
         # 创建默认管理员账户
         print("创建默认账户...")
@@ -77,5 +87,226 @@ def init_database():
             print(f"初始化示例数据时出错: {e}")
             raise
 
+# 大批量灌数 - 先建表、去掉二级索引和约束，用 COPY（PostgreSQL）或 executemany 分批写入，
+# 写完再统一建索引和约束
+BULK_BATCH_ROWS = 50000
+BULK_TABLES = ['teacher', 'student', 'course', 'score']
+SURNAMES = '赵钱孙李周吴郑王冯陈褚卫蒋沈韩杨'
+SEMESTERS = ['2022-2023第一学期', '2022-2023第二学期', '2023-2024第一学期', '2023-2024第二学期']
+
+def generate_dataset(students, teachers, courses, scores_per_student, now=None):
+    """生成确定性的测试数据，返回 {表名: (列名, 行迭代器)}
+
+    课程 i 由教师 T{i % teachers} 讲授；i % 4 == 0 的课程处于开放期，1 未开始，2 已结束，3 未设置。
+    """
+    now = now or datetime.now()
+
+    def window(i):
+        if i % 4 == 0:
+            return now - timedelta(days=1), now + timedelta(days=7)
+        if i % 4 == 1:
+            return now + timedelta(days=7), now + timedelta(days=14)
+        if i % 4 == 2:
+            return now - timedelta(days=14), now - timedelta(days=7)
+        return None, None
+
+    step = max(courses // scores_per_student, 1)
+    return {
+        'teacher': (
+            ['工号', '密码', '姓名'],
+            (
+                (f'T{i:05d}', '123456', f'{SURNAMES[i % len(SURNAMES)]}老师{i}')
+                for i in range(teachers)
+            ),
+        ),
+        'student': (
+            ['学号', '密码', '姓名', '班级', '性别'],
+            (
+                (f'S{i:07d}', '123456', f'{SURNAMES[i % len(SURNAMES)]}{i}',
+                 f'{2020 + i % 4}级{i % 200}班', '男' if i % 2 else '女')
+                for i in range(students)
+            ),
+        ),
+        'course': (
+            ['课程代码', '名称', '开课学期', '课程时间', '教师工号', '成绩开放开始时间', '成绩开放结束时间'],
+            (
+                (f'C{i:05d}', f'课程{i}', SEMESTERS[i % len(SEMESTERS)],
+                 f'周{"一二三四五"[i % 5]} {1 + i % 4 * 2}-{2 + i % 4 * 2}节',
+                 f'T{i % teachers:05d}', *window(i))
+                for i in range(courses)
+            ),
+        ),
+        'score': (
+            ['学号', '课程代码', '分数', '录入教师工号', '录入修改时间'],
+            (
+                (f'S{i:07d}', f'C{(i + j * step) % courses:05d}', float((i * 31 + j * 17) % 101),
+                 f'T{(i + j * step) % courses % teachers:05d}', now)
+                for i in range(students)
+                for j in range(scores_per_student)
+            ),
+        ),
+    }
+
+def _csv_rows(path):
+    """逐行读取 CSV 数据行（跳过表头），读完或生成器关闭时关闭文件"""
+    with open(path, newline='', encoding='utf-8-sig') as stream:
+        reader = csv.reader(stream)
+        next(reader, None)
+        yield from reader
+
+def read_dataset(directory):
+    """读取 teacher.csv / student.csv / course.csv / score.csv，表头为列名，缺少的文件跳过"""
+    dataset = {}
+    for name in BULK_TABLES:
+        path = os.path.join(directory, f'{name}.csv')
+        if not os.path.exists(path):
+            continue
+        with open(path, newline='', encoding='utf-8-sig') as stream:
+            columns = [column.strip() for column in next(csv.reader(stream))]
+        dataset[name] = (columns, _csv_rows(path))
+    return dataset
+
+def _batches(rows, size=BULK_BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _python_value(column, value):
+    # CSV 读入的都是字符串，executemany 路径需要按列类型转换
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        return value
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is float:
+        return float(value)
+    return value
+
+def load_rows(connection, table, columns, rows):
+    """把行写入表，PostgreSQL 用 COPY，其他数据库用 executemany，返回行数"""
+    count = 0
+    if connection.dialect.name == 'postgresql':
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        sql = f'COPY "{table.name}" ({column_list}) FROM STDIN WITH (FORMAT csv)'
+        cursor = connection.connection.cursor()
+        for batch in _batches(rows):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(batch)  # None 写成空字段，COPY 读作 NULL
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            count += len(batch)
+        cursor.close()
+        return count
+
+    table_columns = [table.c[column] for column in columns]
+    for batch in _batches(rows):
+        connection.execute(table.insert(), [
+            {column.name: _python_value(column, value) for column, value in zip(table_columns, row)}
+            for row in batch
+        ])
+        count += len(batch)
+    return count
+
+def _deferred_schema(connection):
+    """二级索引，以及 PostgreSQL 上的外键和唯一约束；灌数前删除，灌数后重建"""
+    indexes = [index for table in db.metadata.sorted_tables for index in table.indexes]
+    constraints = []
+    if connection.dialect.name == 'postgresql':
+        inspector = inspect(connection)
+        for table in db.metadata.sorted_tables:
+            # 未命名的外键由 PostgreSQL 自动命名，按列找回实际的约束名
+            reflected = {
+                ForeignKeyConstraint: {tuple(fk['constrained_columns']): fk['name']
+                                       for fk in inspector.get_foreign_keys(table.name)},
+                UniqueConstraint: {tuple(uq['column_names']): uq['name']
+                                   for uq in inspector.get_unique_constraints(table.name)},
+            }
+            for constraint in table.constraints:
+                names = reflected.get(type(constraint))
+                key = tuple(column.name for column in constraint.columns)
+                if names and key in names:
+                    constraints.append((table, names[key], constraint))
+    return indexes, constraints
+
+def bulk_load(dataset):
+    """重建数据库并批量写入 dataset，返回 {表名: (行数, 秒数)}"""
+    report = {}
+    with app.app_context():
+        print("删除现有表...")
+        db.drop_all()
+        print("创建新表...")
+        db.create_all()
+        stamp()
+
+        with db.engine.begin() as connection:
+            indexes, constraints = _deferred_schema(connection)
+            for table, name, _ in constraints:
+                connection.exec_driver_sql(f'ALTER TABLE "{table.name}" DROP CONSTRAINT "{name}"')
+            for index in indexes:
+                index.drop(bind=connection)
+
+        # 外键依赖顺序写入，每张表单独提交
+        for name in BULK_TABLES:
+            if name not in dataset:
+                continue
+            columns, rows = dataset[name]
+            started = time.perf_counter()
+            with db.engine.begin() as connection:
+                count = load_rows(connection, db.metadata.tables[name], columns, rows)
+            report[name] = (count, time.perf_counter() - started)
+            print(f"{name}: {count} 行, {report[name][1]:.1f} 秒, "
+                  f"{count / report[name][1] if report[name][1] else 0:.0f} 行/秒")
+
+        started = time.perf_counter()
+        with db.engine.begin() as connection:
+            for index in indexes:
+                index.create(bind=connection)
+            for _, _, constraint in constraints:
+                connection.execute(AddConstraint(constraint))
+        print(f"建索引和约束: {time.perf_counter() - started:.1f} 秒")
+
+        if not db.session.get(Teacher, 'admin'):
+            db.session.add(Teacher(工号='admin', 密码='admin123', 姓名='系统管理员'))
+        refresh_released_grades()
+        db.session.commit()
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('ANALYZE')
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='初始化数据库；不带参数时写入演示数据')
+    parser.add_argument('--bulk', action='store_true', help='批量生成测试数据')
+    parser.add_argument('--from-dir', help='从目录中的 teacher/student/course/score.csv 批量导入')
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--teachers', type=int, default=200)
+    parser.add_argument('--courses', type=int, default=2000)
+    parser.add_argument('--scores-per-student', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.from_dir:
+        dataset = read_dataset(args.from_dir)
+        if not dataset:
+            parser.error(f'{args.from_dir} 中没有可导入的 CSV 文件')
+    elif args.bulk:
+        if args.scores_per_student > args.courses:
+            parser.error('--scores-per-student 不能大于 --courses')
+        dataset = generate_dataset(args.students, args.teachers, args.courses, args.scores_per_student)
+    else:
+        init_database()
+        return
+
+    started = time.perf_counter()
+    report = bulk_load(dataset)
+    elapsed = time.perf_counter() - started
+    total = sum(count for count, _ in report.values())
+    print(f"完成: 共 {total} 行, 总耗时 {elapsed:.1f} 秒, {total / elapsed:.0f} 行/秒")
+
 if __name__ == '__main__':
-    init_database()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00
+
+已有数据库（由 db.create_all() 建表）先执行 `flask db stamp 0001`，再 `flask db upgrade`。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'student',
+        sa.Column('学号', sa.String(length=20), nullable=False),
+        sa.Column('密码', sa.String(length=100), nullable=False),
+        sa.Column('姓名', sa.String(length=20), nullable=False),
+        sa.Column('班级', sa.String(length=30), nullable=False),
+        sa.Column('性别', sa.String(length=2), nullable=False),
+        sa.PrimaryKeyConstraint('学号'),
+    )
+    op.create_table(
+        'teacher',
+        sa.Column('工号', sa.String(length=20), nullable=False),
+        sa.Column('密码', sa.String(length=100), nullable=False),
+        sa.Column('姓名', sa.String(length=20), nullable=False),
+        sa.PrimaryKeyConstraint('工号'),
+    )
+    op.create_table(
+        'course',
+        sa.Column('课程代码', sa.String(length=20), nullable=False),
+        sa.Column('名称', sa.String(length=50), nullable=False),
+        sa.Column('开课学期', sa.String(length=20), nullable=False),
+        sa.Column('课程时间', sa.String(length=100), nullable=False),
+        sa.Column('教师工号', sa.String(length=20), nullable=False),
+        sa.Column('成绩开放开始时间', sa.DateTime(), nullable=True),
+        sa.Column('成绩开放结束时间', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['教师工号'], ['teacher.工号']),
+        sa.PrimaryKeyConstraint('课程代码'),
+    )
+    op.create_table(
+        'score',
+        sa.Column('成绩记录id', sa.Integer(), nullable=False),
+        sa.Column('学号', sa.String(length=20), nullable=False),
+        sa.Column('课程代码', sa.String(length=20), nullable=False),
+        sa.Column('分数', sa.Float(), nullable=False),
+        sa.Column('录入教师工号', sa.String(length=20), nullable=False),
+        sa.Column('录入修改时间', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['学号'], ['student.学号']),
+        sa.ForeignKeyConstraint(['课程代码'], ['course.课程代码']),
+        sa.ForeignKeyConstraint(['录入教师工号'], ['teacher.工号']),
+        sa.PrimaryKeyConstraint('成绩记录id'),
+    )
+
+
+def downgrade():
+    op.drop_table('score')
+    op.drop_table('course')
+    op.drop_table('teacher')
+    op.drop_table('student')
@@ -0,0 +1,44 @@
+"""import job table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'import_job',
+        sa.Column('任务id', sa.Integer(), nullable=False),
+        sa.Column('教师工号', sa.String(length=20), nullable=False),
+        sa.Column('文件名', sa.String(length=255), nullable=False),
+        sa.Column('状态', sa.String(length=10), nullable=False),
+        sa.Column('已处理行数', sa.Integer(), nullable=False),
+        sa.Column('成功行数', sa.Integer(), nullable=False),
+        sa.Column('失败行数', sa.Integer(), nullable=False),
+        sa.Column('新增行数', sa.Integer(), nullable=False),
+        sa.Column('更新行数', sa.Integer(), nullable=False),
+        sa.Column('拒绝明细', sa.JSON(), nullable=True),
+        sa.Column('错误信息', sa.Text(), nullable=True),
+        sa.Column('创建时间', sa.DateTime(), nullable=True),
+        sa.Column('开始时间', sa.DateTime(), nullable=True),
+        sa.Column('完成时间', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['教师工号'], ['teacher.工号'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('任务id'),
+    )
+    op.create_index('ix_import_job_教师工号', 'import_job', ['教师工号'])
+
+
+def downgrade():
+    op.drop_index('ix_import_job_教师工号', table_name='import_job')
+    op.drop_table('import_job')
@@ -0,0 +1,54 @@
+"""indexes and constraints for grade hot paths
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 建唯一约束前清理重复成绩，每个 (学号, 课程代码) 保留最后录入的一条
+    op.execute(
+        'DELETE FROM score WHERE "成绩记录id" NOT IN ('
+        'SELECT MAX("成绩记录id") FROM score GROUP BY "学号", "课程代码")'
+    )
+    with op.batch_alter_table('score') as batch_op:
+        batch_op.create_unique_constraint('uq_score_student_course', ['学号', '课程代码'])
+    op.create_index('ix_score_course', 'score', ['课程代码'])
+    op.create_index('ix_score_entered_by', 'score', ['录入教师工号'])
+
+    op.create_index('ix_course_teacher', 'course', ['教师工号'])
+    op.create_index(
+        'ix_course_open_window', 'course', ['成绩开放开始时间', '成绩开放结束时间'],
+        postgresql_where=sa.text('"成绩开放开始时间" IS NOT NULL AND "成绩开放结束时间" IS NOT NULL'),
+    )
+
+    op.create_index('ix_student_class', 'student', ['班级', '学号'])
+    op.create_index('ix_student_gender', 'student', ['性别', '学号'])
+    op.create_index('ix_student_name', 'student', ['姓名'],
+                    postgresql_ops={'姓名': 'varchar_pattern_ops'})
+    op.create_index('ix_teacher_name', 'teacher', ['姓名'],
+                    postgresql_ops={'姓名': 'varchar_pattern_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_teacher_name', table_name='teacher')
+    op.drop_index('ix_student_name', table_name='student')
+    op.drop_index('ix_student_gender', table_name='student')
+    op.drop_index('ix_student_class', table_name='student')
+    op.drop_index('ix_course_open_window', table_name='course')
+    op.drop_index('ix_course_teacher', table_name='course')
+    op.drop_index('ix_score_entered_by', table_name='score')
+    op.drop_index('ix_score_course', table_name='score')
+    with op.batch_alter_table('score') as batch_op:
+        batch_op.drop_constraint('uq_score_student_course', type_='unique')
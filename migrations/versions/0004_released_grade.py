@@ -0,0 +1,52 @@
+"""released grade table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:20:00
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'released_grade',
+        sa.Column('学号', sa.String(length=20), nullable=False),
+        sa.Column('课程代码', sa.String(length=20), nullable=False),
+        sa.Column('课程名称', sa.String(length=50), nullable=False),
+        sa.Column('开课学期', sa.String(length=20), nullable=False),
+        sa.Column('课程时间', sa.String(length=100), nullable=False),
+        sa.Column('教师姓名', sa.String(length=20), nullable=False),
+        sa.Column('分数', sa.Float(), nullable=False),
+        sa.Column('开放结束时间', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['学号'], ['student.学号'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['课程代码'], ['course.课程代码'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('学号', '课程代码'),
+    )
+    op.create_index('ix_released_grade_course', 'released_grade', ['课程代码'])
+
+    # 用当前处于开放窗口内的成绩填充
+    now = datetime.now()
+    op.execute(sa.text(
+        'INSERT INTO released_grade '
+        '(学号, 课程代码, 课程名称, 开课学期, 课程时间, 教师姓名, 分数, 开放结束时间) '
+        'SELECT s.学号, s.课程代码, c.名称, c.开课学期, c.课程时间, t.姓名, s.分数, c.成绩开放结束时间 '
+        'FROM score s JOIN course c ON s.课程代码 = c.课程代码 '
+        'JOIN teacher t ON c.教师工号 = t.工号 '
+        'WHERE c.成绩开放开始时间 <= :now AND c.成绩开放结束时间 >= :now'
+    ).bindparams(now=now))
+
+
+def downgrade():
+    op.drop_index('ix_released_grade_course', table_name='released_grade')
+    op.drop_table('released_grade')
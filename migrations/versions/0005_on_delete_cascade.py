@@ -0,0 +1,64 @@
+"""on delete rules for score and course foreign keys
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 20:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# SQLite 上基线建的外键没有名字，batch 模式按该命名规则找到它们
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s'}
+
+# (表, 列, 引用表, 引用列, 新约束名, ON DELETE)
+FOREIGN_KEYS = [
+    ('course', '教师工号', 'teacher', '工号', 'fk_course_teacher', 'RESTRICT'),
+    ('score', '学号', 'student', '学号', 'fk_score_student', 'CASCADE'),
+    ('score', '课程代码', 'course', '课程代码', 'fk_score_course', 'CASCADE'),
+    ('score', '录入教师工号', 'teacher', '工号', 'fk_score_entered_by', 'SET NULL'),
+]
+
+
+def _existing_foreign_key_names(table):
+    """{列名: 约束名}；PostgreSQL 上是自动生成的名字，SQLite 上按命名规则推出"""
+    names = {}
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys(table):
+        column = fk['constrained_columns'][0]
+        names[column] = fk['name'] or NAMING_CONVENTION['fk'] % {'table_name': table, 'column_0_name': column}
+    return names
+
+
+def upgrade():
+    for table in ('course', 'score'):
+        existing = _existing_foreign_key_names(table)
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for fk_table, column, referent, remote_column, name, ondelete in FOREIGN_KEYS:
+                if fk_table == table:
+                    batch_op.drop_constraint(existing[column], type_='foreignkey')
+                    batch_op.create_foreign_key(name, referent, [column], [remote_column], ondelete=ondelete)
+            if table == 'score':
+                batch_op.alter_column('录入教师工号', existing_type=sa.String(length=20), nullable=True)
+
+
+def downgrade():
+    # 录入教师已被删除的成绩无法恢复非空约束，改记为由管理员录入
+    op.execute('UPDATE score SET "录入教师工号" = \'admin\' WHERE "录入教师工号" IS NULL')
+    for table in ('score', 'course'):
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for fk_table, column, referent, remote_column, name, _ in FOREIGN_KEYS:
+                if fk_table == table:
+                    batch_op.drop_constraint(name, type_='foreignkey')
+                    batch_op.create_foreign_key(
+                        NAMING_CONVENTION['fk'] % {'table_name': table, 'column_0_name': column},
+                        referent, [column], [remote_column],
+                    )
+            if table == 'score':
+                batch_op.alter_column('录入教师工号', existing_type=sa.String(length=20), nullable=False)
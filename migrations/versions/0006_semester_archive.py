@@ -0,0 +1,53 @@
+"""semester archive tables
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 21:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'course_archive',
+        sa.Column('课程代码', sa.String(length=20), nullable=False),
+        sa.Column('开课学期', sa.String(length=20), nullable=False),
+        sa.Column('名称', sa.String(length=50), nullable=False),
+        sa.Column('课程时间', sa.String(length=100), nullable=False),
+        sa.Column('教师工号', sa.String(length=20), nullable=False),
+        sa.Column('教师姓名', sa.String(length=20), nullable=False),
+        sa.Column('归档时间', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('课程代码', '开课学期'),
+    )
+    op.create_index('ix_course_archive_semester', 'course_archive', ['开课学期'])
+
+    op.create_table(
+        'score_archive',
+        sa.Column('学号', sa.String(length=20), nullable=False),
+        sa.Column('开课学期', sa.String(length=20), nullable=False),
+        sa.Column('课程代码', sa.String(length=20), nullable=False),
+        sa.Column('分数', sa.Float(), nullable=False),
+        sa.Column('录入教师工号', sa.String(length=20), nullable=True),
+        sa.Column('录入修改时间', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['学号'], ['student.学号'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['课程代码', '开课学期'], ['course_archive.课程代码', 'course_archive.开课学期'],
+                                name='fk_score_archive_course', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('学号', '开课学期', '课程代码'),
+    )
+    op.create_index('ix_score_archive_course', 'score_archive', ['课程代码', '开课学期'])
+
+
+def downgrade():
+    op.drop_index('ix_score_archive_course', table_name='score_archive')
+    op.drop_table('score_archive')
+    op.drop_index('ix_course_archive_semester', table_name='course_archive')
+    op.drop_table('course_archive')
@@ -0,0 +1,39 @@
+"""pg_trgm indexes for typeahead search
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 23:40:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# (索引名, 表, 列)；SQLite 等其他数据库使用应用进程内的前缀索引，不建这些索引
+SEARCH_INDEXES = [
+    ('ix_student_search', 'student', ['学号', '姓名', '班级']),
+    ('ix_teacher_search', 'teacher', ['工号', '姓名']),
+    ('ix_course_search', 'course', ['课程代码', '名称']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, columns in SEARCH_INDEXES:
+        op.create_index(name, table, columns, postgresql_using='gin',
+                        postgresql_ops={column: 'gin_trgm_ops' for column in columns})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # 扩展可能被其他对象使用，保留不删
+    for name, table, _ in reversed(SEARCH_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,41 @@
+"""lower() prefix indexes for short typeahead keywords
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 10:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# (索引名, 表, 列)；一两个字的关键词只做前缀匹配，lower(列) LIKE 'kw%' 走这些 B 树索引
+PREFIX_INDEXES = [
+    ('ix_student_id_lower', 'student', '学号'),
+    ('ix_student_name_lower', 'student', '姓名'),
+    ('ix_student_class_lower', 'student', '班级'),
+    ('ix_teacher_id_lower', 'teacher', '工号'),
+    ('ix_teacher_name_lower', 'teacher', '姓名'),
+    ('ix_course_code_lower', 'course', '课程代码'),
+    ('ix_course_name_lower', 'course', '名称'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name, table, column in PREFIX_INDEXES:
+        op.create_index(name, table, [sa.text(f'lower("{column}") text_pattern_ops')])
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name, table, _ in reversed(PREFIX_INDEXES):
+        op.drop_index(name, table_name=table)
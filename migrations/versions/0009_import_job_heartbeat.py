@@ -0,0 +1,28 @@
+"""import job heartbeat for cross-process claiming and recovery
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 14:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_job') as batch_op:
+        batch_op.add_column(sa.Column('心跳时间', sa.DateTime(), nullable=True))
+    op.create_index('ix_import_job_status', 'import_job', ['状态', '任务id'])
+
+
+def downgrade():
+    op.drop_index('ix_import_job_status', table_name='import_job')
+    with op.batch_alter_table('import_job') as batch_op:
+        batch_op.drop_column('心跳时间')
@@ -0,0 +1,26 @@
+"""course grade version for cross-process cache validation
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-20 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('course') as batch_op:
+        batch_op.add_column(sa.Column('成绩版本', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('course') as batch_op:
+        batch_op.drop_column('成绩版本')
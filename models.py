@@ -0,0 +1,375 @@
+"""数据模型和共用的数据库操作
+
+app 和 grade_import 都从这里导入模型、db 和成绩/名单 upsert 等共用函数，
+grade_import 不依赖 app 模块，两者之间没有循环导入。
+"""
+from flask import current_app, g, has_request_context, session
+from flask_login import UserMixin
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import DDL, event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.dml import UpdateBase
+from datetime import datetime
+import sqlite3
+import time
+
+# 读写分离 - 标记为只读的页面在 GET 请求中把查询发往只读副本（SQLALCHEMY_BINDS['replica']），
+# 写入、flush 以及刚写入过数据的会话（READ_AFTER_WRITE_SECONDS 内）一律走主库；
+# 页面的标记和写入后读主库的处理见 app.py 的 read_only_view/stick_to_primary
+REPLICA_BIND = 'replica'
+
+class RoutingSession(FlaskSQLAlchemySession):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _reads_from_replica() \
+                and not isinstance(clause, UpdateBase):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _reads_from_replica():
+    return (
+        has_request_context()
+        and g.get('read_replica', False)
+        and REPLICA_BIND in current_app.config['SQLALCHEMY_BINDS']
+        and session.get('primary_until', 0) < time.time()
+    )
+
+# 不绑定应用，由 app.py 调用 db.init_app()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# 删除学生、课程时由数据库级联删除成绩；SQLite 默认不检查外键，需要逐个连接打开
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys = ON')
+        cursor.close()
+
+# 输入联想搜索用的 pg_trgm GIN 索引，支持任意位置的 LIKE/ILIKE；只在 PostgreSQL 上创建
+event.listen(db.metadata, 'before_create',
+             DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'))
+
+def _trigram_index(name, *columns):
+    return db.Index(name, *columns, postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops' for column in columns}).ddl_if(dialect='postgresql')
+
+# 一两个字的关键词在三元组索引中几乎不能过滤，走 lower(列) 的前缀 B 树索引
+def _lower_prefix_index(name, column):
+    return db.Index(name, db.text(f'lower("{column}") text_pattern_ops')).ddl_if(dialect='postgresql')
+
+# 数据库模型
+class Student(UserMixin, db.Model):
+    __tablename__ = 'student'
+    学号 = db.Column(db.String(20), primary_key=True)
+    密码 = db.Column(db.String(100), nullable=False)
+    姓名 = db.Column(db.String(20), nullable=False)
+    班级 = db.Column(db.String(30), nullable=False)
+    性别 = db.Column(db.String(2), nullable=False)
+    
+    # 名单分页按 (筛选列, 学号) 走索引；姓名前缀匹配在 PostgreSQL 上需要 pattern_ops
+    __table_args__ = (
+        db.Index('ix_student_class', '班级', '学号'),
+        db.Index('ix_student_gender', '性别', '学号'),
+        db.Index('ix_student_name', '姓名', postgresql_ops={'姓名': 'varchar_pattern_ops'}),
+        _trigram_index('ix_student_search', '学号', '姓名', '班级'),
+        _lower_prefix_index('ix_student_id_lower', '学号'),
+        _lower_prefix_index('ix_student_name_lower', '姓名'),
+        _lower_prefix_index('ix_student_class_lower', '班级'),
+    )
+    
+    # Flask-Login 需要的属性
+    def get_id(self):
+        return f"student_{self.学号}"
+
+class Teacher(UserMixin, db.Model):
+    __tablename__ = 'teacher'
+    工号 = db.Column(db.String(20), primary_key=True)
+    密码 = db.Column(db.String(100), nullable=False)
+    姓名 = db.Column(db.String(20), nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_teacher_name', '姓名', postgresql_ops={'姓名': 'varchar_pattern_ops'}),
+        _trigram_index('ix_teacher_search', '工号', '姓名'),
+        _lower_prefix_index('ix_teacher_id_lower', '工号'),
+        _lower_prefix_index('ix_teacher_name_lower', '姓名'),
+    )
+    
+    # Flask-Login 需要的属性
+    def get_id(self):
+        return f"teacher_{self.工号}"
+    
+    @property
+    def is_admin(self):
+        return self.工号 == 'admin'
+
+class Course(db.Model):
+    __tablename__ = 'course'
+    课程代码 = db.Column(db.String(20), primary_key=True)
+    名称 = db.Column(db.String(50), nullable=False)
+    开课学期 = db.Column(db.String(20), nullable=False)
+    课程时间 = db.Column(db.String(100), nullable=False)
+    # 教师仍有课程时不允许删除，须先转移或删除其课程
+    教师工号 = db.Column(db.String(20), db.ForeignKey('teacher.工号', name='fk_course_teacher', ondelete='RESTRICT'),
+                     nullable=False)
+    成绩开放开始时间 = db.Column(db.DateTime, nullable=True)
+    成绩开放结束时间 = db.Column(db.DateTime, nullable=True)
+    # 每次刷新该课程的已开放成绩时加一，各进程据此判断缓存的成绩单和排名是否过期
+    成绩版本 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # 部分索引只收录设置了开放时间的课程，供开放窗口查询使用
+    __table_args__ = (
+        db.Index('ix_course_teacher', '教师工号'),
+        db.Index('ix_course_open_window', '成绩开放开始时间', '成绩开放结束时间',
+                 postgresql_where=db.text('"成绩开放开始时间" IS NOT NULL AND "成绩开放结束时间" IS NOT NULL')),
+        _trigram_index('ix_course_search', '课程代码', '名称'),
+        _lower_prefix_index('ix_course_code_lower', '课程代码'),
+        _lower_prefix_index('ix_course_name_lower', '名称'),
+    )
+    
+    # 关系；passive_deletes='all' 让 ORM 删除教师时不加载、不改动其课程，由外键拒绝
+    教师 = db.relationship('Teacher', backref=db.backref('courses', lazy=True, passive_deletes='all'))
+    
+    @property
+    def 成绩开放状态(self):
+        if not self.成绩开放开始时间 or not self.成绩开放结束时间:
+            return "未设置"
+        
+        current_time = datetime.now()
+        if current_time < self.成绩开放开始时间:
+            return "未开始"
+        elif self.成绩开放开始时间 <= current_time <= self.成绩开放结束时间:
+            return "开放中"
+        else:
+            return "已结束"
+
+class Score(db.Model):
+    __tablename__ = 'score'
+    成绩记录id = db.Column(db.Integer, primary_key=True)
+    # 删除学生或课程时成绩由数据库级联删除；录入教师被删除后保留成绩，录入教师置空
+    学号 = db.Column(db.String(20), db.ForeignKey('student.学号', name='fk_score_student', ondelete='CASCADE'),
+                   nullable=False)
+    课程代码 = db.Column(db.String(20), db.ForeignKey('course.课程代码', name='fk_score_course', ondelete='CASCADE'),
+                     nullable=False)
+    分数 = db.Column(db.Float, nullable=False)
+    录入教师工号 = db.Column(db.String(20),
+                       db.ForeignKey('teacher.工号', name='fk_score_entered_by', ondelete='SET NULL'),
+                       nullable=True)
+    录入修改时间 = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # 同一学生同一课程只允许一条成绩，批量导入的 ON CONFLICT 依赖此约束；
+    # 唯一约束同时覆盖按学号的查询，课程和录入教师另建外键索引
+    __table_args__ = (
+        db.UniqueConstraint('学号', '课程代码', name='uq_score_student_course'),
+        db.Index('ix_score_course', '课程代码'),
+        db.Index('ix_score_entered_by', '录入教师工号'),
+    )
+    
+    # 关系；passive_deletes 让 ORM 删除父对象时不再逐条加载子记录，交给外键的 ON DELETE 处理
+    学生 = db.relationship('Student', backref=db.backref('scores', lazy=True, cascade='all', passive_deletes=True))
+    课程 = db.relationship('Course', backref=db.backref('scores', lazy=True, cascade='all', passive_deletes=True))
+    录入教师 = db.relationship('Teacher', backref=db.backref('录入的成绩', lazy=True, passive_deletes=True))
+
+class ReleasedGrade(db.Model):
+    """已开放成绩的物化表，学生端只读这张表，由 refresh_released_grades 维护"""
+    __tablename__ = 'released_grade'
+    # 主键以学号开头，学生查成绩是一次主键范围扫描
+    学号 = db.Column(db.String(20), db.ForeignKey('student.学号', ondelete='CASCADE'), primary_key=True)
+    课程代码 = db.Column(db.String(20), db.ForeignKey('course.课程代码', ondelete='CASCADE'), primary_key=True)
+    课程名称 = db.Column(db.String(50), nullable=False)
+    开课学期 = db.Column(db.String(20), nullable=False)
+    课程时间 = db.Column(db.String(100), nullable=False)
+    教师姓名 = db.Column(db.String(20), nullable=False)
+    分数 = db.Column(db.Float, nullable=False)
+    # 读取时再按结束时间过滤，关闭时间点到了即使还没刷新也不会显示
+    开放结束时间 = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_released_grade_course', '课程代码'),
+    )
+
+class ArchivedCourse(db.Model):
+    """已关闭学期的课程，由 archive_semester 从 course 移入；教师不设外键，保留姓名快照"""
+    __tablename__ = 'course_archive'
+    课程代码 = db.Column(db.String(20), primary_key=True)
+    开课学期 = db.Column(db.String(20), primary_key=True)
+    名称 = db.Column(db.String(50), nullable=False)
+    课程时间 = db.Column(db.String(100), nullable=False)
+    教师工号 = db.Column(db.String(20), nullable=False)
+    教师姓名 = db.Column(db.String(20), nullable=False)
+    归档时间 = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_course_archive_semester', '开课学期'),
+    )
+
+class ArchivedScore(db.Model):
+    """已关闭学期的成绩；主键以学号、学期开头，学生查历史成绩是一次主键范围扫描"""
+    __tablename__ = 'score_archive'
+    学号 = db.Column(db.String(20), db.ForeignKey('student.学号', ondelete='CASCADE'), primary_key=True)
+    开课学期 = db.Column(db.String(20), primary_key=True)
+    课程代码 = db.Column(db.String(20), primary_key=True)
+    分数 = db.Column(db.Float, nullable=False)
+    录入教师工号 = db.Column(db.String(20), nullable=True)
+    录入修改时间 = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.ForeignKeyConstraint(['课程代码', '开课学期'], ['course_archive.课程代码', 'course_archive.开课学期'],
+                                name='fk_score_archive_course', ondelete='CASCADE'),
+        db.Index('ix_score_archive_course', '课程代码', '开课学期'),
+    )
+
+class ImportJob(db.Model):
+    __tablename__ = 'import_job'
+    STATUS_QUEUED = '排队中'
+    STATUS_RUNNING = '处理中'
+    STATUS_DONE = '已完成'
+    STATUS_FAILED = '失败'
+
+    任务id = db.Column(db.Integer, primary_key=True)
+    教师工号 = db.Column(db.String(20), db.ForeignKey('teacher.工号', ondelete='CASCADE'),
+                     nullable=False, index=True)
+    文件名 = db.Column(db.String(255), nullable=False)
+    状态 = db.Column(db.String(10), nullable=False, default=STATUS_QUEUED)
+    已处理行数 = db.Column(db.Integer, nullable=False, default=0)
+    成功行数 = db.Column(db.Integer, nullable=False, default=0)
+    失败行数 = db.Column(db.Integer, nullable=False, default=0)
+    新增行数 = db.Column(db.Integer, nullable=False, default=0)
+    更新行数 = db.Column(db.Integer, nullable=False, default=0)
+    拒绝明细 = db.Column(db.JSON, nullable=True)
+    错误信息 = db.Column(db.Text, nullable=True)
+    创建时间 = db.Column(db.DateTime, default=datetime.now)
+    开始时间 = db.Column(db.DateTime, nullable=True)
+    完成时间 = db.Column(db.DateTime, nullable=True)
+    心跳时间 = db.Column(db.DateTime, nullable=True)  # 处理中的任务每提交一批刷新，长时间不变说明处理进程已退出
+
+    # 各进程领取任务时按状态统计和查找排队任务
+    __table_args__ = (
+        db.Index('ix_import_job_status', '状态', '任务id'),
+    )
+
+    @property
+    def 已结束(self):
+        return self.状态 in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    @property
+    def 处理速度(self):
+        if not self.开始时间:
+            return 0.0
+        elapsed = ((self.完成时间 or datetime.now()) - self.开始时间).total_seconds()
+        return self.已处理行数 / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            'id': self.任务id,
+            'filename': self.文件名,
+            'status': self.状态,
+            'finished': self.已结束,
+            'processed': self.已处理行数,
+            'succeeded': self.成功行数,
+            'failed': self.失败行数,
+            'inserted': self.新增行数,
+            'updated': self.更新行数,
+            'rows_per_second': round(self.处理速度, 1),
+            'error': self.错误信息,
+            'created_at': self.创建时间.isoformat() if self.创建时间 else None,
+            'started_at': self.开始时间.isoformat() if self.开始时间 else None,
+            'finished_at': self.完成时间.isoformat() if self.完成时间 else None,
+        }
+
+# 成绩批量导入 - 整表向量化校验 + IN 查询 + 批量 upsert，查询次数与行数无关；
+# 读表和校验在 grade_import.py 中，依赖 pandas，处理上传文件时才导入
+SCORE_IMPORT_COLUMNS = ['学号', '课程代码', '分数']
+SCORE_IMPORT_BATCH_SIZE = 1000
+SCORE_IMPORT_CHUNK_ROWS = 5000   # 流式导入时每块读取的行数
+SCORE_IMPORT_MAX_REJECTS = 1000  # 最多保留的拒绝明细条数，避免大文件撑爆内存
+
+class GradeImportError(Exception):
+    """成绩文件无法导入（格式不支持、缺少必要列或中途失败）"""
+
+def _chunks(values, size=SCORE_IMPORT_BATCH_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _score_upsert_statement(rows):
+    """构造 INSERT ... ON CONFLICT (学号, 课程代码) DO UPDATE 语句"""
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(Score.__table__).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=['学号', '课程代码'],
+        set_={
+            '分数': stmt.excluded['分数'],
+            '录入修改时间': stmt.excluded['录入修改时间'],
+        },
+    )
+
+# 已开放成绩物化 - 开放窗口内的成绩连同课程、教师信息一起写入 released_grade，
+# 在开放时间点、开放时间修改、成绩或课程信息变化时按课程/学生增量刷新
+def released_grade_source(now):
+    """当前处于开放窗口内的成绩，列顺序与 released_grade 一致"""
+    return select(
+        Score.学号, Score.课程代码, Course.名称, Course.开课学期, Course.课程时间,
+        Teacher.姓名, Score.分数, Course.成绩开放结束时间,
+    ).select_from(Score).join(
+        Course, Score.课程代码 == Course.课程代码
+    ).join(
+        Teacher, Course.教师工号 == Teacher.工号
+    ).where(
+        Course.成绩开放开始时间 <= now,
+        Course.成绩开放结束时间 >= now,
+    )
+
+def refresh_released_grades(course_codes=None, student_ids=None, now=None):
+    """重新物化指定课程（可再限定学生）的已开放成绩，两者都不指定时全量重建
+
+    先删除范围内的旧行，再从成绩表插入当前可见的行，并给涉及课程的成绩版本加一；
+    调用方负责提交事务，因此与触发刷新的成绩/课程修改在同一个事务里生效。
+    """
+    if course_codes is not None and not course_codes:
+        return
+    # Core 语句不会自动 flush，先让同一事务中未写出的修改对 INSERT ... SELECT 可见
+    db.session.flush()
+    table = ReleasedGrade.__table__
+    source = released_grade_source(now or datetime.now())
+    delete = table.delete()
+    if course_codes is not None:
+        source = source.where(Score.课程代码.in_(course_codes))
+        delete = delete.where(table.c.课程代码.in_(course_codes))
+    if student_ids is not None:
+        source = source.where(Score.学号.in_(student_ids))
+        delete = delete.where(table.c.学号.in_(student_ids))
+    db.session.execute(delete)
+
+    # 多个进程同时刷新同一课程时，后提交的一方按主键覆盖
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    columns = [column.name for column in table.columns]
+    statement = dialect.insert(table).from_select(columns, source)
+    statement = statement.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key],
+        set_={name: statement.excluded[name] for name in columns
+              if name not in ('学号', '课程代码')},
+    )
+    db.session.execute(statement)
+
+    bump = Course.__table__.update().values(成绩版本=Course.成绩版本 + 1)
+    if course_codes is not None:
+        bump = bump.where(Course.课程代码.in_(course_codes))
+    db.session.execute(bump)
+
+# 名单批量导入 - 学生和教师名单文件的列定义和 upsert 语句，导入流程见 grade_import.import_roster_file
+ROSTER_IMPORT_SPECS = {
+    'student': {'model': Student, 'key': '学号', 'fields': ['姓名', '班级', '性别']},
+    'teacher': {'model': Teacher, 'key': '工号', 'fields': ['姓名']},
+}
+
+class RosterImportError(Exception):
+    """名单文件无法导入（格式不支持或缺少必要列）"""
+
+def _roster_upsert_statement(model, key, rows):
+    """构造 INSERT ... ON CONFLICT (主键) DO UPDATE 语句，更新除主键外提供的所有列"""
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(model.__table__).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={column: stmt.excluded[column] for column in rows[0] if column != key},
+    )
@@ -0,0 +1,234 @@
+"""启动开销基准测试
+
+用 python -X importtime 统计导入应用的耗时和各依赖包的占比，再模拟 gunicorn --preload：
+主进程导入 wsgi 后 fork 出若干 worker，统计每个 worker 处理请求后的常驻内存（RSS）
+和私有内存（USS，Linux 下读取 /proc/self/smaps_rollup）。结果保存为 JSON，
+指定 --baseline 时与上一次的结果比较，出现退化则以非零状态退出。
+
+用法:
+    python startup_benchmark.py --database-url sqlite:///bench.db
+    python startup_benchmark.py --workers 4 --output startup-after.json --baseline startup-before.json
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+# 只在处理上传文件时才应加载的重型依赖
+LAZY_MODULES = ['pandas', 'numpy', 'openpyxl']
+
+
+def child_env(database_url):
+    env = dict(os.environ, RELEASE_SCHEDULER_ENABLED='0')
+    if database_url:
+        env['DATABASE_URL'] = database_url
+    return env
+
+
+def import_profile(module, env, runs, top):
+    """多次运行 python -X importtime -c 'import module'，返回导入耗时中位数和最重的依赖包"""
+    totals, walls, packages, loaded = [], [], {}, set()
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                capture_output=True, text=True, cwd=HERE, env=env)
+        walls.append((time.perf_counter() - started) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f'导入 {module} 失败:\n{result.stderr[-2000:]}')
+
+        run_packages = {}
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            cumulative, name = int(match.group(2)), match.group(4)
+            root = name.split('.')[0]
+            loaded.add(root)
+            if name == module:
+                totals.append(cumulative / 1000)
+            elif root != module:
+                # 同一个包最外层那次导入的累计耗时最大，即导入整个包的代价
+                run_packages[root] = max(run_packages.get(root, 0), cumulative / 1000)
+        for root, elapsed in run_packages.items():
+            packages.setdefault(root, []).append(elapsed)
+
+    heaviest = sorted(((statistics.median(values), root) for root, values in packages.items()), reverse=True)
+    return {
+        'import_ms': round(statistics.median(totals), 1),
+        'process_ms': round(statistics.median(walls), 1),
+        'top_packages': {root: round(elapsed, 1) for elapsed, root in heaviest[:top]},
+        'lazy_modules_loaded': [name for name in LAZY_MODULES if name in loaded],
+    }
+
+
+def interpreter_ms(env, runs):
+    walls = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], env=env, check=True)
+        walls.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(walls), 1)
+
+
+def memory_kb():
+    """(RSS, USS)，单位 KB；拿不到 USS 时为 None"""
+    rss = uss = None
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss = int(line.split()[1])
+        with open('/proc/self/smaps_rollup') as f:
+            uss = sum(int(line.split()[1]) for line in f
+                      if line.startswith(('Private_Clean:', 'Private_Dirty:')))
+    except OSError:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss = rss or (maxrss // 1024 if sys.platform == 'darwin' else maxrss)
+    return rss, uss
+
+
+def measure_workers(workers, paths):
+    """在子进程中运行：导入 wsgi 后 fork 出 worker，每个 worker 请求 paths 后上报内存"""
+    sys.path.insert(0, HERE)
+    import wsgi
+    from app import init_worker
+
+    master_rss, master_uss = memory_kb()
+    report = {'master': {'rss_kb': master_rss, 'uss_kb': master_uss}, 'workers': []}
+
+    # 最后一个 worker 额外导入 grade_import，模拟处理过上传文件的 worker
+    for index in range(workers + 1):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            init_worker()
+            client = wsgi.application.test_client()
+            statuses = [client.get(path).status_code for path in paths]
+            if index == workers:
+                # 只为加载 grade_import 及其依赖，计入该 worker 的内存
+                importlib.import_module('grade_import')
+            rss, uss = memory_kb()
+            with os.fdopen(write_fd, 'w') as pipe:
+                json.dump({
+                    'rss_kb': rss,
+                    'uss_kb': uss,
+                    'statuses': statuses,
+                    'lazy_modules_loaded': [name for name in LAZY_MODULES if name in sys.modules],
+                }, pipe)
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            result = json.load(pipe)
+        os.waitpid(pid, 0)
+        if index == workers:
+            report['upload_worker'] = result
+        else:
+            report['workers'].append(result)
+    json.dump(report, sys.stdout)
+
+
+def worker_memory(env, workers, paths):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure-workers', str(workers),
+                             *[arg for path in paths for arg in ('--path', path)]],
+                            capture_output=True, text=True, cwd=HERE, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f'测量 worker 内存失败:\n{result.stderr[-2000:]}')
+    report = json.loads(result.stdout.splitlines()[-1])
+    report['worker_rss_kb'] = statistics.median(worker['rss_kb'] for worker in report['workers'])
+    uss = [worker['uss_kb'] for worker in report['workers'] if worker['uss_kb'] is not None]
+    report['worker_uss_kb'] = statistics.median(uss) if uss else None
+    return report
+
+
+def compare(report, baseline, threshold):
+    """返回退化项列表：导入耗时或 worker 内存超过基线 threshold 比例"""
+    checks = [('导入耗时 ms', report['import']['import_ms'], baseline['import']['import_ms'])]
+    if report['memory'] and baseline.get('memory'):
+        checks += [
+            ('worker RSS KB', report['memory']['worker_rss_kb'], baseline['memory']['worker_rss_kb']),
+            ('worker USS KB', report['memory']['worker_uss_kb'], baseline['memory']['worker_uss_kb']),
+        ]
+    return [
+        f'{name}: {previous:g} -> {current:g}'
+        for name, current, previous in checks
+        if current is not None and previous and current > previous * (1 + threshold)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='统计应用导入耗时和每个 worker 的内存占用')
+    parser.add_argument('--database-url', help='应用导入时使用的数据库地址，默认取环境变量/config.py')
+    parser.add_argument('--module', default='wsgi', help='被测的入口模块')
+    parser.add_argument('--runs', type=int, default=5, help='导入耗时测量次数，取中位数')
+    parser.add_argument('--top', type=int, default=15, help='列出导入最慢的依赖包个数')
+    parser.add_argument('--workers', type=int, default=3, help='fork 出的 worker 数')
+    parser.add_argument('--path', action='append', help='每个 worker 请求的路径，可重复，默认 /login')
+    parser.add_argument('--output', help='结果 JSON 路径，默认 startup-<时间>.json')
+    parser.add_argument('--baseline', help='用于比较的上一次结果 JSON')
+    parser.add_argument('--threshold', type=float, default=0.1, help='允许的退化比例')
+    parser.add_argument('--measure-workers', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    paths = args.path or ['/login']
+
+    if args.measure_workers is not None:
+        measure_workers(args.measure_workers, paths)
+        return
+
+    env = child_env(args.database_url)
+    profile = import_profile(args.module, env, args.runs, args.top)
+    profile['interpreter_ms'] = interpreter_ms(env, args.runs)
+    print(f'导入 {args.module}: {profile["import_ms"]:.1f} ms（进程总耗时 {profile["process_ms"]:.1f} ms，'
+          f'其中解释器启动 {profile["interpreter_ms"]:.1f} ms）')
+    print(f'启动时加载的重型依赖: {", ".join(profile["lazy_modules_loaded"]) or "无"}')
+    for root, elapsed in profile['top_packages'].items():
+        print(f'  {root:<24}{elapsed:>10.1f} ms')
+
+    memory = None
+    if hasattr(os, 'fork'):
+        memory = worker_memory(env, args.workers, paths)
+        print(f'\n主进程 RSS {memory["master"]["rss_kb"]} KB')
+        for index, worker in enumerate(memory['workers']):
+            print(f'worker {index}: RSS {worker["rss_kb"]} KB, USS {worker["uss_kb"]} KB, 状态码 {worker["statuses"]}')
+        upload = memory['upload_worker']
+        print(f'处理过上传的 worker: RSS {upload["rss_kb"]} KB, USS {upload["uss_kb"]} KB'
+              f'（加载 {", ".join(upload["lazy_modules_loaded"]) or "无"}）')
+    else:
+        print('\n当前平台不支持 fork，跳过 worker 内存测量')
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'module': args.module,
+        'import': profile,
+        'memory': memory,
+    }
+    output = args.output or f'startup-{datetime.now():%Y%m%d-%H%M%S}.json'
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'\n结果已保存到 {output}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f'\n与 {args.baseline} 相比出现 {len(regressions)} 项退化:')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print(f'\n与 {args.baseline} 相比没有退化')
+
+
+if __name__ == '__main__':
+    main()
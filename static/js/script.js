@@ -29,6 +29,9 @@ function setupEventListeners() {
     // 搜索功能
     setupSearchFunctionality();
     
+    // 输入联想（服务端搜索）
+    setupTypeahead();
+    
     // 模态框事件
     setupModalEvents();
 }
@@ -211,6 +214,49 @@ function setupSearchFunctionality() {
     });
 }
 
+// 输入联想 - 带 data-search="student|teacher|course" 和 data-search-url 的输入框，
+// 输入时向服务端搜索接口查询，结果填入 datalist，不需要预先加载整个名单
+function setupTypeahead() {
+    const inputs = document.querySelectorAll('input[data-search]');
+    inputs.forEach((input, index) => {
+        const datalist = document.createElement('datalist');
+        datalist.id = `typeahead-${index}`;
+        input.after(datalist);
+        input.setAttribute('list', datalist.id);
+        input.setAttribute('autocomplete', 'off');
+        
+        let timer = null;
+        let controller = null;
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const keyword = this.value.trim();
+            if (!keyword) {
+                datalist.innerHTML = '';
+                return;
+            }
+            timer = setTimeout(() => {
+                if (controller) {
+                    controller.abort();
+                }
+                controller = new AbortController();
+                const params = new URLSearchParams({type: input.dataset.search, q: keyword});
+                fetch(`${input.dataset.searchUrl}?${params}`, {signal: controller.signal})
+                    .then(response => response.ok ? response.json() : {results: []})
+                    .then(data => {
+                        datalist.innerHTML = '';
+                        data.results.forEach(item => {
+                            const option = document.createElement('option');
+                            option.value = item.id;
+                            option.label = item.detail ? `${item.name}（${item.detail}）` : item.name;
+                            datalist.appendChild(option);
+                        });
+                    })
+                    .catch(() => {});
+            }, 150);
+        });
+    });
+}
+
 // 设置模态框事件
 function setupModalEvents() {
     // 模态框显示时重置表单
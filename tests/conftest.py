@@ -0,0 +1,22 @@
+"""测试共用的设置：导入 app 之前改用内存数据库并关闭调度器"""
+import os
+import sys
+
+import pytest
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['RELEASE_SCHEDULER_ENABLED'] = '0'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db
+
+
+@pytest.fixture
+def database():
+    """每个测试使用重新建好的空表，在应用上下文中运行"""
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield db
+        db.session.rollback()
@@ -0,0 +1,59 @@
+"""网格批量录入：录入修改时间作为乐观并发的版本号"""
+import pytest
+
+from app import app, db, Student, Teacher, Course, Score
+
+
+@pytest.fixture
+def teacher_client(database):
+    database.session.add_all([
+        Teacher(工号='T1', 姓名='张老师', 密码='p'),
+        Student(学号='S1', 姓名='甲', 班级='1班', 性别='男', 密码='p'),
+        Student(学号='S2', 姓名='乙', 班级='1班', 性别='女', 密码='p'),
+        Course(课程代码='C1', 名称='数学', 开课学期='2026春', 课程时间='周一', 教师工号='T1'),
+    ])
+    database.session.flush()
+    database.session.add_all([
+        Score(学号='S1', 课程代码='C1', 分数=60, 录入教师工号='T1'),
+        Score(学号='S2', 课程代码='C1', 分数=70, 录入教师工号='T1'),
+    ])
+    database.session.commit()
+    client = app.test_client()
+    client.post('/login', data={'username': 'T1', 'password': 'p'})
+    return client
+
+
+def versions(client):
+    rows = client.get('/teacher/api/grades?course_code=C1').get_json()['rows']
+    return {row['学号']: row['录入修改时间'] for row in rows}
+
+
+def save(client, student_id, score_value, version):
+    edit = {'学号': student_id, '课程代码': 'C1', '分数': score_value, '录入修改时间': version}
+    return client.post('/teacher/api/grades', json={'edits': [edit]}).get_json()
+
+
+def test_stale_version_is_reported_as_conflict(teacher_client):
+    read = versions(teacher_client)['S1']
+    assert save(teacher_client, 'S1', 80, read)['applied']
+
+    # 另一位用户仍拿着旧版本号保存，不能覆盖刚保存的成绩
+    result = save(teacher_client, 'S1', 90, read)
+    assert result['applied'] == []
+    assert [(item['学号'], item['reason'], item['current_score']) for item in result['conflicts']] == [
+        ('S1', '成绩已被他人修改', 80.0)]
+    assert db.session.query(Score.分数).filter_by(学号='S1').scalar() == 80
+
+
+def test_null_version_matches_row_without_timestamp(teacher_client):
+    db.session.query(Score).filter_by(学号='S2').update({'录入修改时间': None})
+    db.session.commit()
+    assert versions(teacher_client)['S2'] is None
+
+    result = save(teacher_client, 'S2', 75, None)
+    assert result['conflicts'] == []
+    saved = result['applied'][0]['录入修改时间']
+    assert saved is not None
+    # 保存后有了非空版本号，再用空版本号提交即视为冲突
+    assert save(teacher_client, 'S2', 76, None)['conflicts'][0]['reason'] == '成绩已被他人录入'
+    assert save(teacher_client, 'S2', 77, saved)['applied']
@@ -0,0 +1,48 @@
+"""成绩开放推送：每次开放只向学生页面推送一次 grades_updated
+
+用法:
+    python -m pytest -q tests
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+# 使用内存数据库，导入 app 之前设置
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['RELEASE_SCHEDULER_ENABLED'] = '0'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import (app, db, socketio, Student, Teacher, Course, Score, GRADES_UPDATED_EVENT,
+                 ReleaseScheduler)
+
+
+def test_single_grades_updated_per_release():
+    app.config['TESTING'] = True
+    base = datetime.now()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all([
+            Teacher(工号='T1', 姓名='张老师', 密码='p'),
+            Student(学号='S1', 姓名='甲', 班级='1班', 性别='男', 密码='p'),
+            Course(课程代码='C1', 名称='数学', 开课学期='2026春', 课程时间='周一', 教师工号='T1',
+                   成绩开放开始时间=base + timedelta(seconds=30), 成绩开放结束时间=base + timedelta(days=1)),
+            Score(学号='S1', 课程代码='C1', 分数=90, 录入教师工号='T1'),
+        ])
+        db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'S1', 'password': 'p'})
+    socket = socketio.test_client(app, flask_test_client=client)
+    assert socket.is_connected()
+
+    scheduler = ReleaseScheduler(interval=60, lookback=86400)
+    with app.app_context():
+        for seconds in (0, 60, 120):
+            scheduler.run_once(base + timedelta(seconds=seconds))
+        # 重启或接替的调度器补处理同一次开放时不再推送
+        ReleaseScheduler(interval=60, lookback=86400).run_once(base + timedelta(seconds=150))
+
+    events = [event for event in socket.get_received() if event['name'] == GRADES_UPDATED_EVENT]
+    assert events == [{'name': GRADES_UPDATED_EVENT, 'args': [{'course_codes': ['C1']}], 'namespace': '/'}]
+    socket.disconnect()
@@ -0,0 +1,85 @@
+"""导入任务：跨进程领取的并发上限，以及 worker 启动时对中断任务和残留文件的回收"""
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as app_module
+from app import app, db, claim_import_job, recover_import_jobs, run_import_job, ImportJob, Teacher
+
+
+@pytest.fixture
+def jobs(database, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setitem(app.config, 'IMPORT_WORKERS', 1)
+    # 不启动后台线程，领取和处理都在测试中显式调用
+    submitted = []
+    monkeypatch.setattr(app_module.import_executor, 'submit', lambda fn, *args: submitted.append(fn))
+    database.session.add(Teacher(工号='T1', 姓名='张老师', 密码='p'))
+    database.session.commit()
+    return submitted
+
+
+def add_job(status, **fields):
+    job = ImportJob(教师工号='T1', 文件名='成绩.csv', 状态=status, **fields)
+    db.session.add(job)
+    db.session.commit()
+    return job.任务id
+
+
+def write_upload(folder, job_id, age_seconds=0):
+    path = os.path.join(folder, f'import_{job_id}.csv')
+    with open(path, 'w') as stream:
+        stream.write('学号,课程代码,分数\n')
+    modified = time.time() - age_seconds
+    os.utime(path, (modified, modified))
+    return path
+
+
+def test_claim_respects_global_limit(jobs):
+    first = add_job(ImportJob.STATUS_QUEUED)
+    second = add_job(ImportJob.STATUS_QUEUED)
+
+    assert claim_import_job() == first
+    # 处理中的任务已达 IMPORT_WORKERS，其他进程不能再领取
+    assert claim_import_job() is None
+
+    db.session.get(ImportJob, first).状态 = ImportJob.STATUS_DONE
+    db.session.commit()
+    assert claim_import_job() == second
+    assert db.session.get(ImportJob, second).状态 == ImportJob.STATUS_RUNNING
+
+
+def test_recover_marks_only_stale_running_jobs_failed(jobs):
+    now = datetime.now()
+    stale = add_job(ImportJob.STATUS_RUNNING, 开始时间=now - timedelta(hours=1),
+                    心跳时间=now - timedelta(seconds=app.config['IMPORT_JOB_STALE_SECONDS'] + 60))
+    alive = add_job(ImportJob.STATUS_RUNNING, 开始时间=now - timedelta(hours=1), 心跳时间=now)
+
+    assert recover_import_jobs() == 1
+    db.session.expire_all()
+    assert db.session.get(ImportJob, stale).状态 == ImportJob.STATUS_FAILED
+    assert db.session.get(ImportJob, alive).状态 == ImportJob.STATUS_RUNNING
+    # 回收后接着处理排队任务
+    assert jobs == [app_module.process_import_queue]
+
+
+def test_recover_keeps_fresh_uploads(jobs):
+    folder = app.config['UPLOAD_FOLDER']
+    old = app.config['IMPORT_JOB_STALE_SECONDS'] + 60
+    finished = write_upload(folder, add_job(ImportJob.STATUS_DONE), age_seconds=old)
+    queued = write_upload(folder, add_job(ImportJob.STATUS_QUEUED), age_seconds=old)
+    # 另一个进程刚保存、任务行尚未提交的上传文件
+    uploading = write_upload(folder, 999)
+
+    recover_import_jobs()
+    assert not os.path.exists(finished)
+    assert os.path.exists(queued)
+    assert os.path.exists(uploading)
+
+
+def test_run_deleted_job_removes_upload(jobs):
+    path = write_upload(app.config['UPLOAD_FOLDER'], 42)
+    run_import_job(42)
+    assert not os.path.exists(path)
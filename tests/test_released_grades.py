@@ -0,0 +1,77 @@
+"""已开放成绩物化表：全量和按范围刷新，以及调度器在开放/结束时间点的刷新"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import (db, Student, Teacher, Course, Score, ReleasedGrade, ReleaseScheduler,
+                 refresh_released_grades)
+
+
+@pytest.fixture
+def now(database):
+    now = datetime.now()
+    windows = {
+        'OPEN': (now - timedelta(days=1), now + timedelta(days=1)),
+        'LATER': (now + timedelta(days=1), now + timedelta(days=2)),
+        'ENDED': (now - timedelta(days=2), now - timedelta(days=1)),
+        'UNSET': (None, None),
+    }
+    database.session.add_all([
+        Teacher(工号='T1', 姓名='张老师', 密码='p'),
+        Student(学号='S1', 姓名='甲', 班级='1班', 性别='男', 密码='p'),
+        Student(学号='S2', 姓名='乙', 班级='1班', 性别='女', 密码='p'),
+    ] + [
+        Course(课程代码=code, 名称=code, 开课学期='2026春', 课程时间='周一', 教师工号='T1',
+               成绩开放开始时间=start, 成绩开放结束时间=end)
+        for code, (start, end) in windows.items()
+    ])
+    database.session.flush()
+    database.session.add_all([
+        Score(学号=student_id, 课程代码=code, 分数=80, 录入教师工号='T1')
+        for student_id in ('S1', 'S2') for code in windows
+    ])
+    database.session.commit()
+    return now
+
+
+def released():
+    return sorted(db.session.query(ReleasedGrade.学号, ReleasedGrade.课程代码, ReleasedGrade.分数))
+
+
+def grade_versions():
+    return dict(db.session.query(Course.课程代码, Course.成绩版本))
+
+
+def test_full_refresh_materializes_open_windows_only(now):
+    refresh_released_grades(now=now)
+    db.session.commit()
+    assert released() == [('S1', 'OPEN', 80.0), ('S2', 'OPEN', 80.0)]
+    assert grade_versions() == {'OPEN': 1, 'LATER': 1, 'ENDED': 1, 'UNSET': 1}
+
+
+def test_scoped_refresh_touches_only_given_rows(now):
+    refresh_released_grades(now=now)
+    db.session.query(Score).filter(Score.课程代码 == 'OPEN').update({'分数': 95})
+    refresh_released_grades(['OPEN'], ['S1'], now=now)
+    db.session.commit()
+    # 只刷新了 S1，S2 的物化行保持原值，等到它自己的刷新
+    assert released() == [('S1', 'OPEN', 95.0), ('S2', 'OPEN', 80.0)]
+    assert grade_versions() == {'OPEN': 2, 'LATER': 1, 'ENDED': 1, 'UNSET': 1}
+
+
+def test_scheduler_releases_and_withdraws_at_boundaries(now):
+    course = db.session.get(Course, 'LATER')
+    course.成绩开放开始时间 = now + timedelta(seconds=30)
+    course.成绩开放结束时间 = now + timedelta(seconds=90)
+    db.session.commit()
+
+    scheduler = ReleaseScheduler(interval=60, lookback=0)
+    assert scheduler.run_once(now) == now + timedelta(seconds=30)
+    assert released() == []
+
+    scheduler.run_once(now + timedelta(seconds=60))
+    assert released() == [('S1', 'LATER', 80.0), ('S2', 'LATER', 80.0)]
+
+    scheduler.run_once(now + timedelta(seconds=120))
+    assert released() == []
+    assert grade_versions()['LATER'] == 2
@@ -0,0 +1,59 @@
+"""名单键集分页：游标的编码、解码和非法游标的处理"""
+import base64
+import json
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from app import _decode_cursor, _encode_cursor, student_roster_page, Student
+
+COLUMNS = [Student.班级, Student.学号]
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def test_cursor_round_trip():
+    assert _decode_cursor(_encode_cursor(['2020级1班', 'S001']), COLUMNS) == ['2020级1班', 'S001']
+
+
+@pytest.mark.parametrize('cursor', [
+    '不是base64',
+    raw_cursor('{not json'),
+    raw_cursor(json.dumps({'班级': '1班'})),
+    raw_cursor(json.dumps(['1班'])),
+    raw_cursor(json.dumps(['1班', 'S001', 'extra'])),
+    raw_cursor(json.dumps(['1班', 1])),
+    raw_cursor(json.dumps(['1班', True])),
+    raw_cursor(json.dumps(['1班', ['S001']])),
+    raw_cursor(json.dumps(['1班', None])),
+], ids=['base64', 'json', 'object', 'short', 'long', 'int', 'bool', 'nested', 'null'])
+def test_invalid_cursor_decodes_to_none(cursor):
+    assert _decode_cursor(cursor, COLUMNS) is None
+
+
+def test_pages_cover_roster_once_and_bad_cursor_restarts(database):
+    database.session.add_all([
+        Student(学号=f'S{i:03d}', 姓名=f'生{i}', 班级=f'{i % 3}班', 性别='男', 密码='p') for i in range(7)
+    ])
+    database.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        args = {'sort': '班级', 'page_size': '3'}
+        if cursor:
+            args['cursor'] = cursor
+        page, cursor = student_roster_page(MultiDict(args))
+        seen += [student.学号 for student in page]
+        if cursor is None:
+            break
+    # 班级相同的按学号排序，翻页不重复也不遗漏
+    expected = sorted((f'{i % 3}班', f'S{i:03d}') for i in range(7))
+    assert seen == [student_id for _, student_id in expected]
+
+    first_page, _ = student_roster_page(MultiDict({'sort': '班级', 'page_size': '3'}))
+    tampered, _ = student_roster_page(MultiDict({'sort': '班级', 'page_size': '3',
+                                                 'cursor': raw_cursor(json.dumps([1, 2]))}))
+    assert tampered == first_page
+
@@ -0,0 +1,14 @@
+"""生产环境 WSGI 入口
+
+用法:
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+import os
+import sys
+
+# 添加当前目录到 Python 路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+
+application = create_app()